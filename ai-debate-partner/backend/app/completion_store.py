@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+DEFAULT_STORE_PATH = "completions.jsonl"
+STORE_MODES = ("off", "record", "replay")
+LATENCY_MODES = ("original", "zero")
+logger = logging.getLogger(__name__)
+
+
+class ReplayMissError(LookupError): # no recorded completion for a request
+    pass
+
+
+def completionKey(model: str, messages: List[Dict[str, str]], temperature: Any) -> str: # content hash of a request
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionStore: # append-only jsonl of request hashes and responses
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._tail_checked = False
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]: # recorded response for a request hash
+        return self._records.get(key)
+
+    def append(self, record: Dict[str, Any]) -> None: # persist one exchange; single o_append write per line
+        line = (json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+            try:
+                if not self._tail_checked:
+                    line = self._tornTailPrefix(fd) + line
+                    self._tail_checked = True
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+            self._records[record["key"]] = record
+
+    def _tornTailPrefix(self, fd: int) -> bytes: # newline to terminate a partial record left by an interrupted writer
+        size = os.fstat(fd).st_size
+        if size == 0:
+            return b""
+        os.lseek(fd, size - 1, os.SEEK_SET)
+        return b"" if os.read(fd, 1) == b"\n" else b"\n"
+
+    def _load(self) -> None: # index existing records; later lines win
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # tolerate a torn final line from an interrupted writer
+                self._records[record["key"]] = record
+
+
+class RecordingClient: # wraps a live client and records every chat completion
+    def __init__(self, inner: Any, store: CompletionStore) -> None:
+        self.inner = inner
+        self.store = store
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, *, model: str, messages: List[Dict[str, str]], temperature: Any = None, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        completion = self.inner.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, **kwargs
+        )
+        latency = time.perf_counter() - started
+        usage = getattr(completion, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.store.append(
+            {
+                "key": completionKey(model, messages, temperature),
+                "model": model,
+                "messages": messages,
+                "content": _completionText(completion),
+                "latency": round(latency, 4),
+                "usage": {
+                    "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                    "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+                    "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+                },
+            }
+        )
+        return completion
+
+
+class ReplayClient: # serves recorded completions without touching the network
+    def __init__(self, store: CompletionStore, latency: str = "original") -> None:
+        if latency not in LATENCY_MODES:
+            raise ValueError(f"Unknown replay latency mode: {latency}")
+        self.store = store
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, *, model: str, messages: List[Dict[str, str]], temperature: Any = None, **_: Any) -> Any:
+        record = self.store.lookup(completionKey(model, messages, temperature))
+        if record is None:
+            raise ReplayMissError("No recorded completion for this request")
+        if self.latency == "original":
+            time.sleep(record.get("latency", 0))
+        usage = record.get("usage", {})
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=record["content"]))],
+            usage=SimpleNamespace(
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0),
+                prompt_tokens_details=SimpleNamespace(cached_tokens=usage.get("cached_tokens", 0)),
+            ),
+        )
+
+
+def storeMode(mode: Optional[str] = None) -> str: # resolved COMPLETION_STORE_MODE
+    mode = mode or os.getenv("COMPLETION_STORE_MODE") or "off"
+    if mode not in STORE_MODES:
+        raise ValueError(f"Unknown completion store mode: {mode}")
+    return mode
+
+
+def wrapClient(
+    client: Any,
+    *,
+    mode: Optional[str] = None,
+    path: Optional[Path] = None,
+    latency: Optional[str] = None,
+) -> Any: # apply record/replay around a client per COMPLETION_STORE_* settings
+    mode = storeMode(mode)
+    if mode == "off":
+        return client
+
+    store = CompletionStore(path or Path(os.getenv("COMPLETION_STORE_PATH") or DEFAULT_STORE_PATH))
+    if mode == "replay":
+        logger.info("Replaying %d recorded completions from %s", len(store), store.path)
+        return ReplayClient(store, latency=latency or os.getenv("COMPLETION_REPLAY_LATENCY") or "original")
+    if client is None:
+        logger.warning("Completion recording requested but no LLM client is available.")
+        return None
+    return RecordingClient(client, store)
+
+
+def _completionText(completion: object) -> str: # assistant text from an sdk response
+    choices = getattr(completion, "choices", None)
+    if not choices:
+        return ""
+    message = getattr(choices[0], "message", None)
+    content = getattr(message, "content", None)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(getattr(part, "text", "") or "" for part in content)
+    return ""
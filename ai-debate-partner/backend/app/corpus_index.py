@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # windows has no flock; single writer assumed
+    fcntl = None
+
+INDEX_DIRNAME = ".index"
+GENERATION_FILE = "generation"
+LOCK_FILE = "lock"
+SNAPSHOT_PATTERN = "snapshot-{:012d}.bin"
+SNAPSHOT_MAGIC = b"DPCI"
+SNAPSHOT_VERSION = 1
+SNAPSHOTS_RETAINED = 2
+ATTACH_ATTEMPTS = 5
+
+_HEADER = struct.Struct("<4sIQ20s")  # magic, version, chunk count, corpus fingerprint
+_ENTRY = struct.Struct("<QIQI")  # source offset/length, content offset/length
+_GENERATION = struct.Struct("<Q")
+
+
+class SnapshotView(Sequence[Tuple[str, str]]): # read-only chunk table backed by a mapped snapshot
+    def __init__(self, buffer: mmap.mmap | None = None) -> None:
+        self._buffer = buffer
+        self.fingerprint = b""
+        self._count = 0
+        if buffer is not None:
+            magic, version, count, fingerprint = _HEADER.unpack_from(buffer, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError("Unrecognised corpus snapshot format")
+            self._count = count
+            self.fingerprint = fingerprint
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, idx):  # type: ignore[override]
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self._count))]
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError(idx)
+        src_off, src_len, body_off, body_len = _ENTRY.unpack_from(
+            self._buffer, _HEADER.size + idx * _ENTRY.size
+        )
+        source = self._buffer[src_off : src_off + src_len].decode("utf-8")
+        content = self._buffer[body_off : body_off + body_len].decode("utf-8")
+        return source, content
+
+
+class SharedCorpusIndex: # generation-counted chunk snapshots shared between worker processes
+    def __init__(self, index_dir: Path) -> None:
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._generation_path = self.index_dir / GENERATION_FILE
+        with self._locked():
+            if not self._generation_path.exists() or self._generation_path.stat().st_size < _GENERATION.size:
+                self._generation_path.write_bytes(_GENERATION.pack(0))
+        self._generation_file = open(self._generation_path, "r+b")
+        self._generation_map = mmap.mmap(self._generation_file.fileno(), _GENERATION.size)
+        self._view = SnapshotView()
+        self._attached_generation = 0
+        self._attach_lock = threading.Lock()
+
+    @property
+    def generation(self) -> int: # latest generation published by any worker
+        return _GENERATION.unpack_from(self._generation_map, 0)[0]
+
+    def snapshot(self) -> SnapshotView: # return the newest snapshot, remapping if another worker published
+        with self._attach_lock:
+            for _ in range(ATTACH_ATTEMPTS):
+                current = self.generation
+                if current == self._attached_generation:
+                    break
+                try:
+                    self._attach(current)
+                    break
+                except FileNotFoundError:
+                    continue  # pruned after a newer publish; re-read the counter
+            return self._view
+
+    def publish(
+        self,
+        fingerprint: Callable[[], bytes],
+        load: Callable[[], Sequence[Tuple[str, str]]],
+        *,
+        force: bool = True,
+    ) -> int: # rebuild under the lock and bump the generation
+        with self._locked():
+            current = self.generation
+            corpus_id = fingerprint()
+            if not force and current and self.snapshot().fingerprint == corpus_id:
+                return current  # another worker already published this corpus
+            chunks = load()
+            next_generation = current + 1
+            target = self.index_dir / SNAPSHOT_PATTERN.format(next_generation)
+            tmp_path = target.with_suffix(".tmp")
+            tmp_path.write_bytes(_encodeSnapshot(chunks, corpus_id))
+            os.replace(tmp_path, target)
+            _GENERATION.pack_into(self._generation_map, 0, next_generation)
+            self._generation_map.flush()
+            self._pruneSnapshots(next_generation)
+            with self._attach_lock:
+                self._attach(next_generation)
+        return next_generation
+
+    def _attach(self, generation: int) -> None: # map a generation; caller holds the attach lock
+        if generation == 0:
+            view = SnapshotView()
+        else:
+            path = self.index_dir / SNAPSHOT_PATTERN.format(generation)
+            with open(path, "rb") as handle:
+                view = SnapshotView(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+        # never close the old view: in-flight readers may still hold it, and the
+        # mapping is released once the last reference is dropped
+        self._view = view
+        self._attached_generation = generation
+
+    def _pruneSnapshots(self, latest: int) -> None: # drop snapshots no worker should still be attaching to
+        for path in self.index_dir.glob("snapshot-*.bin"):
+            try:
+                generation = int(path.stem.split("-", 1)[1])
+            except ValueError:
+                continue
+            if generation <= latest - SNAPSHOTS_RETAINED:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass  # still mapped on platforms that forbid unlinking open files
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(self.index_dir / LOCK_FILE, "a+b") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def corpusFingerprint(paths: Sequence[Path]) -> bytes: # cheap identity of the corpus files on disk
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.digest()
+
+
+def _encodeSnapshot(chunks: Sequence[Tuple[str, str]], fingerprint: bytes) -> bytes: # serialise header, offset table and text blob
+    table_end = _HEADER.size + len(chunks) * _ENTRY.size
+    entries: List[bytes] = []
+    blob = bytearray()
+    for source, content in chunks:
+        src_bytes = source.encode("utf-8")
+        body_bytes = content.encode("utf-8")
+        src_off = table_end + len(blob)
+        blob += src_bytes
+        body_off = table_end + len(blob)
+        blob += body_bytes
+        entries.append(_ENTRY.pack(src_off, len(src_bytes), body_off, len(body_bytes)))
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(chunks), fingerprint)
+    return header + b"".join(entries) + bytes(blob)
+
+
+def openIndex(index_dir: Path) -> Optional[SharedCorpusIndex]: # open shared index, or None when the directory is unusable
+    try:
+        return SharedCorpusIndex(index_dir)
+    except OSError:
+        return None
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 from datetime import datetime
-from typing import List, Sequence, Tuple
+from typing import List, Optional, Sequence, Tuple
 from uuid import uuid4
 
 from sqlalchemy import Column, DateTime, Integer, String, Text
@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from .db import Base
 from .llm import DebateLLM, LLMMessage
+from .prefetch import PrefetchCache, PrefetchedTurn
 from .retrieval import CorpusRetriever, RetrievedContext, formatContext
 from .schemas import MessagePayload
 
@@ -37,9 +38,15 @@ class DebateSession(Base): # sql model for debate metadata
 
 
 class DebateManager: # facade for session storage and model responses
-    def __init__(self, retriever: CorpusRetriever, llm: DebateLLM) -> None:
+    def __init__(
+        self,
+        retriever: CorpusRetriever,
+        llm: DebateLLM,
+        prefetch_cache: Optional[PrefetchCache] = None,
+    ) -> None:
         self.retriever = retriever
         self.llm = llm
+        self.prefetch_cache = prefetch_cache or PrefetchCache()
 
     def startSession(self, db: Session, *, topic: str, stance: str) -> Tuple[DebateSession, str, List[str], List[str], bool]: # create session and generate opening
         session = DebateSession(topic=topic, stance=stance)
@@ -60,6 +67,7 @@ class DebateManager: # facade for session storage and model responses
         session: DebateSession,
         user_message: str,
     ) -> Tuple[str, List[str], List[str], bool]: # persist user rebuttal and return counter-argument
+        prefetched = self.prefetch_cache.take(session.id, session.history)
         session.appendMessage(
             MessagePayload(role="user", content=user_message, citations=[])
         )
@@ -67,24 +75,55 @@ class DebateManager: # facade for session storage and model responses
             session=session,
             db=db,
             user_message=user_message,
+            prefetched=prefetched,
         )
         return reply, citations, hallucinations, opposition_consistent
 
+    def prefetch(self, *, session: DebateSession, partial_message: str) -> PrefetchedTurn: # warm retrieval and prompt while the user types
+        history = [
+            LLMMessage(role=msg.role, content=msg.content)
+            for msg in session.historyMessages()
+        ]
+        query = f"{session.topic} {partial_message}"
+        corpus_generation = self.retriever.generation
+        entry = PrefetchedTurn(
+            history_snapshot=session.history,
+            history=history,
+            session_layers=self.llm.sessionLayers(session.topic, session.stance),
+            query=query,
+            contexts=self.retriever.retrieveContexts(query=query),
+            corpus_generation=corpus_generation,
+        )
+        self.prefetch_cache.store(session.id, entry)
+        return entry
+
     def _generateReply(
         self,
         *,
         session: DebateSession,
         db: Session,
         user_message: str,
+        prefetched: Optional[PrefetchedTurn] = None,
     ) -> Tuple[str, List[str], List[str], bool]: # build assistant message and update metrics
-        history_payloads = session.historyMessages()
-        history = [
-            LLMMessage(role=msg.role, content=msg.content)
-            for msg in history_payloads
-        ]
-        contexts = self.retriever.retrieveContexts(
-            query=f"{session.topic} {user_message}"
-        )
+        query = f"{session.topic} {user_message}"
+        session_layers = None
+        if prefetched is not None:
+            # only the new user turn is missing from the prefetched history
+            history = prefetched.history + [LLMMessage(role="user", content=user_message)]
+            session_layers = prefetched.session_layers
+        else:
+            history = [
+                LLMMessage(role=msg.role, content=msg.content)
+                for msg in session.historyMessages()
+            ]
+        if (
+            prefetched is not None
+            and prefetched.query == query
+            and prefetched.corpus_generation == self.retriever.generation
+        ):
+            contexts = prefetched.contexts
+        else:
+            contexts = self.retriever.retrieveContexts(query=query)
         context_bundle, citations = formatContext(contexts)
         reply = self.llm.generateReply(
             topic=session.topic,
@@ -93,6 +132,7 @@ class DebateManager: # facade for session storage and model responses
             context=contexts,
             history=history,
             context_bundle=context_bundle,
+            session_layers=session_layers,
         )
         hallucinations = self.llm.detectHallucinations(reply, contexts)
         opposition_consistent = self.llm.oppositionConsistent(reply, session.stance)
@@ -1,19 +1,66 @@
 from __future__ import annotations
 
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from statistics import mean
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
+from .completion_store import ReplayMissError
 from .debate import DebateManager, DebateSession
 from .schemas import EvaluationResponse, EvaluationScores, MessagePayload
 
+DEFAULT_JUDGE_CONCURRENCY = 4
+DEFAULT_JUDGE_DEADLINE_SECONDS = 20.0
+DEFAULT_JUDGE_CACHE_SIZE = 4096
+
+Exchange = Tuple[str, MessagePayload]  # preceding user message, assistant reply
+Judgment = Dict[str, float]
+
 
 class EvaluationService: # derive aqs metrics
-    def __init__(self, debate_manager: DebateManager) -> None:
+    def __init__(
+        self,
+        debate_manager: DebateManager,
+        *,
+        judge_mode: Optional[bool] = None,
+        judge_concurrency: Optional[int] = None,
+        judge_deadline: Optional[float] = None,
+        judge_cache_size: Optional[int] = None,
+    ) -> None:
         self.debate_manager = debate_manager
+        self.judge_mode = judge_mode if judge_mode is not None else os.getenv("EVALUATION_MODE") == "judge"
+        self.judge_concurrency = judge_concurrency if judge_concurrency is not None else int(
+            os.getenv("JUDGE_CONCURRENCY") or DEFAULT_JUDGE_CONCURRENCY
+        )
+        self.judge_deadline = judge_deadline if judge_deadline is not None else float(
+            os.getenv("JUDGE_DEADLINE_SECONDS") or DEFAULT_JUDGE_DEADLINE_SECONDS
+        )
+        self.judge_cache_size = judge_cache_size if judge_cache_size is not None else int(
+            os.getenv("JUDGE_CACHE_SIZE") or DEFAULT_JUDGE_CACHE_SIZE
+        )
+        # lru of graded exchanges; one pool so JUDGE_CONCURRENCY bounds all requests together
+        self._judgments: OrderedDict[str, Judgment] = OrderedDict()
+        self._judgments_lock = threading.Lock()
+        self._judge_pool = ThreadPoolExecutor(
+            max_workers=max(1, self.judge_concurrency),
+            thread_name_prefix="judge",
+        )
 
-    def evaluateSession(self, db: Session, session_id: str) -> EvaluationResponse: # evaluate persisted session
+    def close(self) -> None: # stop the judge pool; queued judgments are dropped
+        self._judge_pool.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "EvaluationService":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def evaluateSession(self, db: Session, session_id: str, *, judge: Optional[bool] = None) -> EvaluationResponse: # evaluate persisted session
         session = self.debate_manager.getSession(db, session_id)
         if not session:
             raise ValueError(f"Session {session_id} not found")
@@ -26,6 +73,17 @@ class EvaluationService: # derive aqs metrics
         logic = self._scoreLogic(assistant_messages)
         rebuttal = self._scoreRebuttal(history)
 
+        judged_exchanges = 0
+        use_judge = self.judge_mode if judge is None else judge
+        if use_judge:
+            exchanges = self._exchanges(history)
+            judgments = self._judgeExchanges(session, exchanges)
+            judged_exchanges = sum(1 for item in judgments if item is not None)
+            clarity = self._blendScore("clarity", judgments, clarity)
+            evidence = self._blendScore("evidence", judgments, evidence)
+            logic = self._blendScore("logic", judgments, logic)
+            rebuttal = self._blendScore("rebuttal", judgments, rebuttal)
+
         opposition_consistency = (self.debate_manager.oppositionRatio(session) * 100)
         hallucination_rate = self.debate_manager.hallucinationRate(session) * 100
         aqs_overall = round(mean([clarity, evidence, logic, rebuttal]), 2)
@@ -46,8 +104,82 @@ class EvaluationService: # derive aqs metrics
             opposition_consistency=round(opposition_consistency, 2),
             label=label,
             notes=notes,
+            judged_exchanges=judged_exchanges,
         )
 
+    def _exchanges(self, history: List[MessagePayload]) -> List[Exchange]: # pair each assistant turn with the user turn before it
+        exchanges: List[Exchange] = []
+        last_user = ""
+        for msg in history:
+            if msg.role == "user":
+                last_user = msg.content
+            elif msg.role == "assistant":
+                exchanges.append((last_user, msg))
+                last_user = ""
+        return exchanges
+
+    def _judgeExchanges(self, session: DebateSession, exchanges: List[Exchange]) -> List[Optional[Judgment]]: # grade uncached exchanges concurrently within the deadline
+        keys = [self._judgmentKey(session, idx, exchange) for idx, exchange in enumerate(exchanges)]
+        with self._judgments_lock:
+            results: List[Optional[Judgment]] = [self._judgments.get(key) for key in keys]
+            for key, result in zip(keys, results):
+                if result is not None:
+                    self._judgments.move_to_end(key)
+        pending = [idx for idx, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        llm = self.debate_manager.llm
+        futures: Dict[Future, int] = {}
+        for idx in pending:
+            user_message, reply = exchanges[idx]
+            future = self._judge_pool.submit(
+                llm.judgeExchange,
+                topic=session.topic,
+                user_stance=session.stance,
+                user_message=user_message,
+                reply=reply.content,
+                citations=reply.citations,
+            )
+            # late judgments still land in the cache for the next evaluation
+            future.add_done_callback(lambda fut, key=keys[idx]: self._storeJudgment(key, fut))
+            futures[future] = idx
+        done, not_done = wait(futures, timeout=self.judge_deadline)
+        for future in not_done:
+            future.cancel()  # drop queued work; running calls finish and fill the cache
+
+        for future in done:
+            if future.cancelled():
+                continue
+            exc = future.exception()
+            if isinstance(exc, ReplayMissError):
+                raise exc
+            if exc is None:
+                results[futures[future]] = future.result()
+        return results
+
+    def _storeJudgment(self, key: str, future: Future) -> None: # cache a finished judgment
+        if future.cancelled() or future.exception() is not None:
+            return
+        judgment = future.result()
+        if judgment is not None:
+            with self._judgments_lock:
+                self._judgments[key] = judgment
+                self._judgments.move_to_end(key)
+                while len(self._judgments) > self.judge_cache_size:
+                    self._judgments.popitem(last=False)
+
+    def _judgmentKey(self, session: DebateSession, index: int, exchange: Exchange) -> str: # identity of a graded exchange
+        user_message, reply = exchange
+        digest = hashlib.sha1(f"{user_message}\0{reply.content}".encode("utf-8")).hexdigest()
+        return f"{session.id}:{index}:{digest}"
+
+    def _blendScore(self, dimension: str, judgments: List[Optional[Judgment]], heuristic: float) -> float: # average judged turns, heuristic for the rest
+        if not judgments:
+            return heuristic
+        values = [item[dimension] if item is not None else heuristic for item in judgments]
+        return self._clampValue(mean(values), 1.0, 5.0)
+
     def _scoreClarity(self, messages: List[MessagePayload]) -> float: # score clarity
         if not messages:
             return 1.0
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import json
 import logging
 import os
+import re
+import threading
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 try:
     from openai import OpenAI
@@ -13,10 +17,13 @@ except ImportError:
 
 OpenAIClient = Any
 
+from .completion_store import ReplayMissError, storeMode, wrapClient
 from .retrieval import RetrievedContext, formatContext
 
 PROMPT_DIR = Path(__file__).parent / "prompts"
 DEFAULT_MODEL = "gpt-4o-mini"
+JUDGE_DIMENSIONS = ("clarity", "evidence", "logic", "rebuttal")
+SESSION_LAYER_CACHE_SIZE = 512
 logger = logging.getLogger(__name__)
 
 
@@ -33,13 +40,38 @@ class LLMMessage: # minimal chat message
     content: str
 
 
+PromptLayers = Tuple[Dict[str, str], ...]
+
+
+@dataclass
+class PromptUsage: # cumulative provider token usage
+    requests: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def cacheHitRatio(self) -> float: # share of prompt tokens served from the provider cache
+        if not self.prompt_tokens:
+            return 0.0
+        return self.cached_tokens / self.prompt_tokens
+
+
 class DebateLLM: # openai chat abstraction
     def __init__(self, *, client: Optional[OpenAIClient] = None, model_name: Optional[str] = None) -> None: # load prompts and config client
         self.antisycophancy_prompt = _loadPrompt("system_antisycophancy.txt")
         self.guardrails_prompt = _loadPrompt("system_factuality_guardrails.txt")
         self.model_name = model_name or os.getenv("MODEL_NAME") or DEFAULT_MODEL
         self.client: Optional[OpenAIClient]
-        self.client = client or self._initClient()
+        if client is None:
+            # replay never talks to the provider, so skip building a live client
+            client = wrapClient(None if storeMode() == "replay" else self._initClient())
+        self.client = client
+        # static guardrails compiled once; per-session layers memoised by (topic, stance)
+        self.system_prompt = self.buildSystemPrompt()
+        self._session_layers = lru_cache(maxsize=SESSION_LAYER_CACHE_SIZE)(self._compileSessionLayers)
+        self.usage = PromptUsage()
+        self._usage_lock = threading.Lock()
 
     def _initClient(self) -> Optional[OpenAIClient]: # init openai client
         if OpenAI is None:
@@ -62,6 +94,30 @@ class DebateLLM: # openai chat abstraction
         prompts = [self.antisycophancy_prompt, self.guardrails_prompt]
         return "\n\n".join([p for p in prompts if p])
 
+    def buildSessionPrompt(self, topic: str, user_stance: str) -> str: # per-session debater instructions
+        debater = (
+            "You are a professional debater tasked with arguing against the user. "
+            f"The topic is '{topic}'. The user's stance is: '{user_stance}'. "
+            "Your goal is to adopt and maintain the OPPOSITE stance throughout the entire conversation. "
+            "Never agree with the user. "
+            "Construct compelling counter-arguments using the provided evidence where relevant. "
+            "In your opening statement, clearly define the opposing position you will be defending. "
+            "Integrate evidence naturally into your argument without explicitly citing filenames or chunk IDs. "
+            "Review the conversation history to avoid repeating arguments or evidence. "
+            "Directly address the user's latest point. "
+            "Open the debate naturally by countering the user's stance."
+            "Be concise yet persuasive in your responses. Your response length is somewhat up to your discretion based on what the user prompts you with."
+            "While length is somewhat up to your discretion, you MUST keep responses between around 25 and 150 words."
+        )
+        return debater
+
+    def sessionLayers(self, topic: str, user_stance: str) -> PromptLayers: # stable prompt prefix for a session
+        return self._session_layers(topic, user_stance)
+
+    def _compileSessionLayers(self, topic: str, user_stance: str) -> PromptLayers: # guardrails then session instructions
+        layers = [self.system_prompt, self.buildSessionPrompt(topic, user_stance)]
+        return tuple({"role": "system", "content": layer} for layer in layers if layer)
+
     def generateSubtopics(self, topic: str) -> List[str]: # generate 5 subtopics
         if self.client is not None:
             try:
@@ -74,6 +130,7 @@ class DebateLLM: # openai chat abstraction
                     messages=[{"role": "user", "content": prompt}],
                     temperature=1,
                 )
+                self._recordUsage(completion)
                 content = self._extractContent(completion)
                 if content:
                     # parse numbered list
@@ -87,6 +144,8 @@ class DebateLLM: # openai chat abstraction
                         else:
                             subtopics.append(line)
                     return subtopics[:5]
+            except ReplayMissError:
+                raise  # a replay miss must fail the run, not become a reply
             except Exception as exc:
                 logger.exception("LLM subtopic generation failed: %s", exc)
 
@@ -102,6 +161,7 @@ class DebateLLM: # openai chat abstraction
         context: Iterable[RetrievedContext],
         history: List[LLMMessage],
         context_bundle: Optional[str] = None,
+        session_layers: Optional[PromptLayers] = None,
         temperature: float = 1,
     ) -> str: # call openai api
         context_items = list(context)
@@ -117,6 +177,7 @@ class DebateLLM: # openai chat abstraction
             user_message=user_message,
             history=history,
             context_text=context_bundle,
+            session_layers=session_layers,
         )
         try:
             completion = self.client.chat.completions.create(
@@ -124,10 +185,13 @@ class DebateLLM: # openai chat abstraction
                 messages=messages,
                 temperature=temperature,
             )
+            self._recordUsage(completion)
             content = self._extractContent(completion)
             if content:
                 return content
             return "Failed to get an answer from API: Empty response."
+        except ReplayMissError:
+            raise  # a replay miss must fail the run, not become a reply
         except Exception as exc:
             logger.exception("LLM request failed: %s", exc)
             return f"Failed to get an answer from API: {exc}"
@@ -140,35 +204,11 @@ class DebateLLM: # openai chat abstraction
         user_message: str,
         history: List[LLMMessage],
         context_text: str,
-    ) -> List[dict[str, str]]: # translate history and context to messages
-        instructions = [self.buildSystemPrompt()]
-        instructions.append(
-            (
-                "You are a professional debater tasked with arguing against the user. "
-                f"The topic is '{topic}'. The user's stance is: '{user_stance}'. "
-                "Your goal is to adopt and maintain the OPPOSITE stance throughout the entire conversation. "
-                "Never agree with the user. "
-                "Construct compelling counter-arguments using the provided evidence where relevant. "
-                "In your opening statement, clearly define the opposing position you will be defending. "
-                "Integrate evidence naturally into your argument without explicitly citing filenames or chunk IDs. "
-                "Review the conversation history to avoid repeating arguments or evidence. "
-                "Directly address the user's latest point. "
-                "Open the debate naturally by countering the user's stance."
-                "Be concise yet persuasive in your responses. Your response length is somewhat up to your discretion based on what the user prompts you with."
-                "While length is somewhat up to your discretion, you MUST keep responses between around 25 and 150 words."
-            )
-        )
-        if context_text:
-            instructions.append(
-                "Retrieved evidence you can use:\n" + context_text
-            )
-        else:
-            instructions.append(
-                "No supporting documents were retrieved. Flag uncertainty when making claims that are not grounded."
-            )
-
-        system_message = "\n\n".join(filter(None, instructions)).strip()
-        messages: List[dict[str, str]] = [{"role": "system", "content": system_message}]
+        session_layers: Optional[PromptLayers] = None,
+    ) -> List[dict[str, str]]: # layer messages so the prefix stays stable across turns
+        # static guardrails -> session instructions -> append-only history -> per-turn evidence,
+        # so every turn shares the previous turn's prefix for provider prompt caching
+        messages: List[dict[str, str]] = list(session_layers or self.sessionLayers(topic, user_stance))
         for item in history:
             messages.append({"role": item.role, "content": item.content})
 
@@ -178,8 +218,82 @@ class DebateLLM: # openai chat abstraction
             )
             messages.append({"role": "user", "content": opener})
 
+        if context_text:
+            evidence = "Retrieved evidence you can use:\n" + context_text
+        else:
+            evidence = "No supporting documents were retrieved. Flag uncertainty when making claims that are not grounded."
+        messages.append({"role": "system", "content": evidence.strip()})
         return messages
 
+    def _recordUsage(self, completion: object) -> None: # accumulate prompt and cached token counts
+        usage = getattr(completion, "usage", None)
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) or 0
+        # one line per request so totals can be summed across worker processes
+        logger.info(
+            "llm_usage pid=%s prompt_tokens=%s cached_tokens=%s completion_tokens=%s",
+            os.getpid(),
+            prompt_tokens,
+            cached_tokens,
+            completion_tokens,
+        )
+        with self._usage_lock:
+            self.usage.requests += 1
+            self.usage.prompt_tokens += prompt_tokens
+            self.usage.cached_tokens += cached_tokens
+            self.usage.completion_tokens += completion_tokens
+
+    def judgeExchange(
+        self,
+        *,
+        topic: str,
+        user_stance: str,
+        user_message: str,
+        reply: str,
+        citations: List[str],
+    ) -> Optional[Dict[str, float]]: # grade one exchange on the aqs rubric; None if unavailable
+        if self.client is None:
+            return None
+
+        prompt = (
+            "You are grading one turn of a debate in which the assistant argues against the user. "
+            f"Topic: '{topic}'. User stance: '{user_stance}'.\n\n"
+            f"User said:\n{user_message or '(opening turn)'}\n\n"
+            f"Assistant replied:\n{reply}\n\n"
+            f"Sources cited: {', '.join(citations) if citations else 'none'}\n\n"
+            "Score the assistant reply from 1 to 5 on clarity, evidence, logic and rebuttal "
+            "(how directly it answers the user's point). "
+            'Respond with JSON only, e.g. {"clarity": 4, "evidence": 3, "logic": 4, "rebuttal": 5}.'
+        )
+        try:
+            completion = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=1,
+            )
+            self._recordUsage(completion)
+            return self._parseJudgment(self._extractContent(completion))
+        except ReplayMissError:
+            raise  # a replay miss must fail the run, not become a reply
+        except Exception as exc:
+            logger.exception("LLM judge request failed: %s", exc)
+            return None
+
+    def _parseJudgment(self, content: str) -> Optional[Dict[str, float]]: # pull rubric scores from judge output
+        match = re.search(r"\{.*\}", content, re.DOTALL)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+            scores = {key: float(data[key]) for key in JUDGE_DIMENSIONS}
+        except (ValueError, KeyError, TypeError):
+            return None
+        return {key: max(1.0, min(5.0, value)) for key, value in scores.items()}
+
     def _extractContent(self, completion: object) -> str: # extract assistant content
         choices = getattr(completion, "choices", None)
         if not choices:
@@ -1,3 +1,5 @@
+import os
+
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
@@ -15,6 +17,9 @@ from .schemas import (
     DebateRespondResponse,
     EvaluationRequest,
     EvaluationResponse,
+    LLMUsageResponse,
+    PrefetchRequest,
+    PrefetchResponse,
     StartDebateRequest,
     StartDebateResponse,
     SubtopicRequest,
@@ -42,7 +47,7 @@ evaluation_service = EvaluationService(debate_manager=debate_manager)
 @app.on_event("startup")
 def onStartup() -> None:
     initDb()
-    retriever.refreshCorpus()
+    retriever.syncCorpus()
 
 
 @app.get("/health")
@@ -50,6 +55,19 @@ def healthCheck() -> dict[str, str]: # readiness probe
     return {"status": "ok"}
 
 
+@app.get("/llm/usage", response_model=LLMUsageResponse)
+def llmUsage() -> LLMUsageResponse: # this worker's token usage; sum the llm_usage log lines across workers
+    usage = llm.usage
+    return LLMUsageResponse(
+        worker_pid=os.getpid(),
+        requests=usage.requests,
+        prompt_tokens=usage.prompt_tokens,
+        cached_tokens=usage.cached_tokens,
+        completion_tokens=usage.completion_tokens,
+        cache_hit_ratio=round(usage.cacheHitRatio, 4),
+    )
+
+
 @app.post("/topic/subtopics", response_model=SubtopicResponse)
 def generateSubtopics(payload: SubtopicRequest) -> SubtopicResponse: # generate subtopics
     subtopics = llm.generateSubtopics(payload.topic)
@@ -104,13 +122,29 @@ def debateRespond(
     )
 
 
+@app.post("/debate/prefetch", response_model=PrefetchResponse)
+def debatePrefetch(
+    payload: PrefetchRequest,
+    db: Session = Depends(getSession),
+) -> PrefetchResponse: # warm the next turn while the user types
+    session = debate_manager.getSession(db, payload.session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    entry = debate_manager.prefetch(session=session, partial_message=payload.partial_message)
+    return PrefetchResponse(
+        session_id=session.id,
+        citations=[ctx.source for ctx in entry.contexts],
+    )
+
+
 @app.post("/evaluate", response_model=EvaluationResponse)
 def evaluateSession(
     payload: EvaluationRequest,
     db: Session = Depends(getSession),
 ) -> EvaluationResponse: # compute rubric feedback
     try:
-        response = evaluation_service.evaluateSession(db, payload.session_id)
+        response = evaluation_service.evaluateSession(db, payload.session_id, judge=payload.judge)
         # clear corpus after evaluation
         retriever.clearCorpus()
         return response
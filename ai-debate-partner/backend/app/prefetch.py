@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from .llm import LLMMessage, PromptLayers
+from .retrieval import RetrievedContext
+
+DEFAULT_TTL_SECONDS = 30.0
+DEFAULT_MAX_ENTRIES = 1024
+
+
+@dataclass
+class PrefetchedTurn: # speculative work done while the user is typing
+    history_snapshot: str
+    history: List[LLMMessage]
+    session_layers: PromptLayers
+    query: str
+    contexts: Sequence[RetrievedContext]
+    corpus_generation: int
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class PrefetchCache: # short-lived per-session cache of pre-assembled turns
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        configured_ttl = os.getenv("PREFETCH_TTL_SECONDS")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(configured_ttl or DEFAULT_TTL_SECONDS)
+        self.max_entries = max_entries
+        self._entries: Dict[str, PrefetchedTurn] = {}
+        self._lock = threading.Lock()
+
+    def store(self, session_id: str, entry: PrefetchedTurn) -> None: # replace any earlier prefetch for the session
+        with self._lock:
+            self._evictExpired()
+            if len(self._entries) >= self.max_entries and session_id not in self._entries:
+                oldest = min(self._entries, key=lambda key: self._entries[key].created_at)
+                del self._entries[oldest]
+            self._entries[session_id] = entry
+
+    def take(self, session_id: str, history_snapshot: str) -> Optional[PrefetchedTurn]: # pop entry if still fresh and history unchanged
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.created_at > self.ttl_seconds:
+            return None
+        if entry.history_snapshot != history_snapshot:
+            return None
+        return entry
+
+    def _evictExpired(self) -> None: # drop stale entries; caller holds the lock
+        cutoff = time.monotonic() - self.ttl_seconds
+        for key in [key for key, entry in self._entries.items() if entry.created_at < cutoff]:
+            del self._entries[key]
@@ -1,9 +1,12 @@
+import heapq
 import os
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, List, Sequence, Tuple
 
+from .corpus_index import INDEX_DIRNAME, corpusFingerprint, openIndex
+
 DEFAULT_CHUNK_SIZE = 400
 DEFAULT_OVERLAP = 40
 
@@ -39,14 +42,39 @@ class CorpusRetriever: # lightweight local retriever
             self.corpus_dir = base_dir / "data" / "corpora"
         self.chunk_size = chunk_size
         self.overlap = overlap
-        self.documents = self._loadDocuments()
-
-    def _loadDocuments(self) -> List[RetrievedContext]: # read and chunk corpus files
+        # chunks live in a memory-mapped snapshot shared by every worker process;
+        # fall back to a private list when the corpus directory is not writable
+        self._index = openIndex(self.corpus_dir / INDEX_DIRNAME)
+        self._local_chunks: List[Tuple[str, str]] = []
+        self._local_generation = 0
+        self.syncCorpus()
+
+    @property
+    def documents(self) -> List[RetrievedContext]: # materialise current chunks
+        return [RetrievedContext(source=source, content=content) for source, content in self._chunks()]
+
+    @property
+    def generation(self) -> int: # changes whenever the corpus is republished
+        if self._index is not None:
+            return self._index.generation
+        return self._local_generation
+
+    def _chunks(self) -> Sequence[Tuple[str, str]]: # (source, content) pairs from the newest snapshot
+        if self._index is not None:
+            return self._index.snapshot()
+        return self._local_chunks
+
+    def _corpusFiles(self) -> List[Path]: # corpus text files in load order
         if not self.corpus_dir.exists():
             return []
+        return sorted(self.corpus_dir.rglob("*.txt"))
 
+    def _loadChunks(self) -> List[Tuple[str, str]]: # chunk records for a snapshot
+        return [(ctx.source, ctx.content) for ctx in self._loadDocuments()]
+
+    def _loadDocuments(self) -> List[RetrievedContext]: # read and chunk corpus files
         contexts: List[RetrievedContext] = []
-        for path in sorted(self.corpus_dir.rglob("*.txt")):
+        for path in self._corpusFiles():
             text = path.read_text(encoding="utf-8")
             for idx, chunk in enumerate(self._chunkText(text)):
                 contexts.append(
@@ -78,8 +106,22 @@ class CorpusRetriever: # lightweight local retriever
         self.refreshCorpus()
         return filename
 
-    def refreshCorpus(self) -> None: # reload corpus chunks
-        self.documents = self._loadDocuments()
+    def refreshCorpus(self) -> None: # rebuild chunks and publish them to all workers
+        if self._index is None:
+            self._local_chunks = self._loadChunks()
+            self._local_generation += 1
+            return
+        self._index.publish(self._fingerprint, self._loadChunks)
+
+    def syncCorpus(self) -> None: # attach to the shared snapshot, rebuilding only if the files changed
+        if self._index is None:
+            self._local_chunks = self._loadChunks()
+            self._local_generation += 1
+            return
+        self._index.publish(self._fingerprint, self._loadChunks, force=False)
+
+    def _fingerprint(self) -> bytes: # identity of the files backing a snapshot
+        return corpusFingerprint(self._corpusFiles())
 
     def clearCorpus(self) -> None: # delete all files in corpus
         if self.corpus_dir.exists():
@@ -88,17 +130,19 @@ class CorpusRetriever: # lightweight local retriever
                     path.unlink()
                 except OSError:
                     pass  # best effort deletion
-        self.documents = []
+        self.refreshCorpus()
 
     def retrieveContexts(self, query: str, limit: int = 3) -> Sequence[RetrievedContext]: # return top-n chunks
-        if not query or not self.documents:
+        chunks = self._chunks()
+        if not query or not chunks:
             return []
 
-        ranked = sorted(
-            self.documents,
-            key=lambda doc: -self._overlapScore(query.lower(), doc.content.lower()),
+        ranked = heapq.nsmallest(
+            limit,
+            chunks,
+            key=lambda chunk: -self._overlapScore(query.lower(), chunk[1].lower()),
         )
-        return ranked[:limit]
+        return [RetrievedContext(source=source, content=content) for source, content in ranked]
 
     def _overlapScore(self, query: str, text: str) -> int: # score overlap
         window = set(word for word in query.split() if word not in STOP_WORDS)
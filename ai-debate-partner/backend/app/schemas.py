@@ -52,8 +52,28 @@ class DebateRespondResponse(BaseModel): # assistant counter-response
     opposition_consistent: bool
 
 
+class PrefetchRequest(BaseModel): # partial rebuttal while the user is typing
+    session_id: str
+    partial_message: str = ""
+
+
+class PrefetchResponse(BaseModel): # acknowledgement of warmed turn
+    session_id: str
+    citations: List[str] = Field(default_factory=list)
+
+
+class LLMUsageResponse(BaseModel): # cumulative provider token usage for one worker process
+    worker_pid: int
+    requests: int
+    prompt_tokens: int
+    cached_tokens: int
+    completion_tokens: int
+    cache_hit_ratio: float
+
+
 class EvaluationRequest(BaseModel): # request for rubric feedback
     session_id: str
+    judge: Optional[bool] = Field(None, description="Grade exchanges with the LLM judge; defaults to EVALUATION_MODE")
 
 
 class EvaluationScores(BaseModel): # breakdown of aqs scores
@@ -71,3 +91,4 @@ class EvaluationResponse(BaseModel): # aggregated evaluation metrics
     opposition_consistency: float
     label: str
     notes: Optional[str] = None
+    judged_exchanges: int = 0
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from .completion_store import wrapClient
+from .db import Base
+from .debate import DebateManager
+from .evaluation import EvaluationService
+from .llm import DebateLLM
+from .retrieval import CorpusRetriever
+
+DEFAULT_WORKERS = 8
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DebateScript: # one scripted debate from the input file
+    topic: str
+    stance: str
+    turns: List[str] = field(default_factory=list)
+    script_id: Optional[str] = None
+
+
+@dataclass
+class TurnTiming: # wall time for a single start/respond call
+    turn: int
+    seconds: float
+    reply_chars: int
+
+
+@dataclass
+class SimulationResult: # evaluation and timings for one debate
+    script_id: str
+    topic: str
+    stance: str
+    session_id: Optional[str] = None
+    evaluation: Optional[Dict[str, Any]] = None
+    turns: List[TurnTiming] = field(default_factory=list)
+    total_seconds: float = 0.0
+    error: Optional[str] = None
+
+
+class StubCompletionClient: # deterministic, network-free stand-in for the openai client
+    def __init__(self) -> None:
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, *, messages: List[Dict[str, str]], **_: Any) -> SimpleNamespace:
+        last_user = next(
+            (msg["content"] for msg in reversed(messages) if msg["role"] == "user"),
+            "",
+        )
+        digest = hashlib.sha1(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+        content = (
+            f"I disagree with the claim that {last_user.strip()[:120]!r}. "
+            f"The evidence points the other way, therefore the opposing view holds. [{digest[:8]}]"
+        )
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def loadScripts(path: Path) -> List[DebateScript]: # parse jsonl of scripted debates
+    scripts: List[DebateScript] = []
+    with open(path, encoding="utf-8") as handle:
+        for line_no, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            scripts.append(
+                DebateScript(
+                    topic=item["topic"],
+                    stance=item["stance"],
+                    turns=list(item.get("turns", [])),
+                    script_id=str(item.get("id", line_no)),
+                )
+            )
+    return scripts
+
+
+def simulateDebate(
+    script: DebateScript,
+    *,
+    debate_manager: DebateManager,
+    evaluation_service: EvaluationService,
+    database_url: str = "sqlite://",
+) -> SimulationResult: # run one scripted debate against an isolated database
+    result = SimulationResult(
+        script_id=script.script_id or "",
+        topic=script.topic,
+        stance=script.stance,
+    )
+    # a private in-memory database per debate keeps workers from contending on sqlite locks
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+    started = time.perf_counter()
+    try:
+        turn_start = time.perf_counter()
+        session, reply, *_ = debate_manager.startSession(db, topic=script.topic, stance=script.stance)
+        db.commit()
+        result.session_id = session.id
+        result.turns.append(TurnTiming(0, time.perf_counter() - turn_start, len(reply)))
+
+        for idx, user_message in enumerate(script.turns, start=1):
+            turn_start = time.perf_counter()
+            reply, *_ = debate_manager.respond(db, session=session, user_message=user_message)
+            db.commit()
+            result.turns.append(TurnTiming(idx, time.perf_counter() - turn_start, len(reply)))
+
+        result.evaluation = evaluation_service.evaluateSession(db, session.id).model_dump()
+    except Exception as exc:  # keep the batch going; record the failure
+        logger.exception("Simulated debate %s failed: %s", result.script_id, exc)
+        db.rollback()
+        result.error = str(exc)
+    finally:
+        db.close()
+        engine.dispose()
+    result.total_seconds = time.perf_counter() - started
+    return result
+
+
+def iterSimulation(
+    scripts: Iterable[DebateScript],
+    *,
+    debate_manager: DebateManager,
+    workers: int = DEFAULT_WORKERS,
+    database_url: str = "sqlite://",
+    evaluation_service: Optional[EvaluationService] = None,
+) -> Iterator[SimulationResult]: # yield results as debates finish on a bounded pool
+    owns_service = evaluation_service is None
+    service = evaluation_service or EvaluationService(debate_manager=debate_manager)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [
+                pool.submit(
+                    simulateDebate,
+                    script,
+                    debate_manager=debate_manager,
+                    evaluation_service=service,
+                    database_url=database_url,
+                )
+                for script in scripts
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        if owns_service:
+            service.close()
+
+
+def runSimulation(
+    scripts: Iterable[DebateScript],
+    *,
+    debate_manager: DebateManager,
+    workers: int = DEFAULT_WORKERS,
+    database_url: str = "sqlite://",
+    evaluation_service: Optional[EvaluationService] = None,
+) -> List[SimulationResult]: # library entry point; results in completion order
+    return list(
+        iterSimulation(
+            scripts,
+            debate_manager=debate_manager,
+            workers=workers,
+            database_url=database_url,
+            evaluation_service=evaluation_service,
+        )
+    )
+
+
+def buildManager(
+    *,
+    provider: str,
+    corpus_dir: Optional[Path] = None,
+    store_path: Optional[Path] = None,
+    replay_latency: str = "zero",
+) -> DebateManager: # wire retriever and llm for a run
+    client = None
+    if provider == "stub":
+        client = StubCompletionClient()
+    elif provider == "replay":
+        client = wrapClient(None, mode="replay", path=store_path, latency=replay_latency)
+    llm = DebateLLM(client=client)
+    if provider == "openai" and llm.client is None:
+        raise SystemExit("Real provider requested but no LLM client could be initialised.")
+    return DebateManager(retriever=CorpusRetriever(corpus_dir), llm=llm)
+
+
+def main(argv: Optional[List[str]] = None) -> int: # cli: python -m app.simulator scripts.jsonl
+    parser = argparse.ArgumentParser(description="Run scripted debates offline and score them.")
+    parser.add_argument("scripts", type=Path, help="JSONL with topic, stance and turns per line")
+    parser.add_argument("-o", "--output", type=Path, help="write JSONL results here (default stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--provider", choices=["stub", "openai", "replay"], default="stub")
+    parser.add_argument("--corpus-dir", type=Path, default=None)
+    parser.add_argument("--store", type=Path, default=None, help="recorded completions for --provider replay")
+    parser.add_argument("--replay-latency", choices=["original", "zero"], default="zero")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    logging.basicConfig(level=logging.WARNING)
+    scripts = loadScripts(args.scripts)
+    manager = buildManager(
+        provider=args.provider,
+        corpus_dir=args.corpus_dir,
+        store_path=args.store,
+        replay_latency=args.replay_latency,
+    )
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    started = time.perf_counter()
+    failures = 0
+    try:
+        for result in iterSimulation(scripts, debate_manager=manager, workers=args.workers):
+            failures += result.error is not None
+            out.write(json.dumps(asdict(result)) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    rate = len(scripts) / elapsed * 3600 if elapsed else 0.0
+    usage = manager.llm.usage
+    print(
+        f"{len(scripts)} debates, {failures} failed, {elapsed:.1f}s ({rate:.0f} debates/hour), "
+        f"{usage.cached_tokens}/{usage.prompt_tokens} prompt tokens cached",
+        file=sys.stderr,
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,6 @@
-import { FormEvent, useMemo, useState } from 'react';
+import { FormEvent, useEffect, useMemo, useState } from 'react';
+
+const PREFETCH_DEBOUNCE_MS = 400;
 
 type TranscriptItem = {
   role: 'user' | 'assistant';
@@ -11,12 +13,20 @@ type TranscriptItem = {
 type DebateChatProps = {
   transcript: TranscriptItem[];
   onSend: (message: string) => Promise<void> | void;
+  onDraftIdle?: (draft: string) => void;
   busy?: boolean;
 };
 
-export function DebateChat({ transcript, onSend, busy = false }: DebateChatProps) { // renders live debate transcript
+export function DebateChat({ transcript, onSend, onDraftIdle, busy = false }: DebateChatProps) { // renders live debate transcript
   const [draft, setDraft] = useState('');
 
+  useEffect(() => {
+    // let the backend prefetch once typing pauses
+    if (!onDraftIdle || busy || !draft.trim()) return;
+    const timer = window.setTimeout(() => onDraftIdle(draft.trim()), PREFETCH_DEBOUNCE_MS);
+    return () => window.clearTimeout(timer);
+  }, [draft, busy, onDraftIdle]);
+
   const lastAssistant = useMemo(
     // track latest assistant turn
     () => transcript.filter((entry) => entry.role === 'assistant').slice(-1)[0],
@@ -39,6 +39,14 @@ export async function sendDebateMessage(sessionId: string, userMessage: string)
   return response.data;
 }
 
+export async function prefetchDebateTurn(sessionId: string, partialMessage: string) { // warm next turn while typing
+  const response = await api.post('/debate/prefetch', {
+    session_id: sessionId,
+    partial_message: partialMessage,
+  });
+  return response.data;
+}
+
 export async function evaluateSession(sessionId: string) { // request rubric feedback
   const response = await api.post('/evaluate', { session_id: sessionId });
   return response.data;
@@ -1,9 +1,9 @@
 import Link from 'next/link';
 import { useRouter } from 'next/router';
-import { useEffect, useMemo, useState } from 'react';
+import { useCallback, useEffect, useMemo, useState } from 'react';
 
 import { DebateChat } from '../components/DebateChat';
-import { sendDebateMessage, startDebate } from '../lib/api';
+import { prefetchDebateTurn, sendDebateMessage, startDebate } from '../lib/api';
 
 type TranscriptItem = {
   role: 'user' | 'assistant';
@@ -119,6 +119,15 @@ export default function DebatePage() { // live debate surface
     }
   };
 
+  const handleDraftIdle = useCallback(
+    (draft: string) => {
+      // speculative; failures only cost the warm cache
+      if (!metadata) return;
+      prefetchDebateTurn(metadata.sessionId, draft).catch(() => undefined);
+    },
+    [metadata]
+  );
+
   if (!router.isReady) {
     return (
       <main className="app-shell">
@@ -179,7 +188,7 @@ export default function DebatePage() { // live debate surface
             </header>
           </div>
 
-          <DebateChat transcript={transcript} onSend={handleSend} busy={busy} />
+          <DebateChat transcript={transcript} onSend={handleSend} onDraftIdle={handleDraftIdle} busy={busy} />
 
           <div className="panel" style={{ textAlign: 'right' }}>
             <Link